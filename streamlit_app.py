@@ -1,707 +1,1234 @@
-import streamlit as st
-import os
-import warnings
-import time
-from datetime import datetime
-import io
-from io import BytesIO
-warnings.filterwarnings('ignore')
-
-# FIX FOR CHROMADB/SQLITE3
-try:
-    import sys
-    import pysqlite3
-    sys.modules['sqlite3'] = sys.modules.pop('pysqlite3')
-    import sqlite3
-    st.info(f"✅ SQLite patched to version: {sqlite3.sqlite_version}")
-except ImportError:
-    st.error("❌ pysqlite3-binary not installed. Add to requirements.txt.")
-
-# Import Required Libraries
-from crewai import Agent, Task, Crew, Process
-from crewai.llm import LLM
-import json
-
-# DOCX Libraries for Word Document Generation
-from docx import Document
-from docx.shared import Inches, Pt
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.enum.style import WD_STYLE_TYPE
-from docx.oxml.shared import OxmlElement, qn
-
-# Fix RGB Color import
-try:
-    from docx.shared import RGBColor
-except ImportError:
-    pass  # Use default colors
-
-# Configure Streamlit Page
-st.set_page_config(
-    page_title="Multi-Agent AI Analysis System",
-    page_icon="🤖",
-    layout="wide"
-)
-
-# Custom CSS for professional look
-st.markdown("""
-<style>
-    .main-header {
-        font-size: 2.5em;
-        font-weight: bold;
-        text-align: center;
-        color: #1f77b4;
-        margin-bottom: 0.5em;
-    }
-    .sub-header {
-        font-size: 1.5em;
-        font-weight: bold;
-        color: #ff7f0e;
-        margin-bottom: 1em;
-    }
-    .status-box {
-        background-color: #f0f2f6;
-        padding: 1em;
-        border-radius: 0.5em;
-        border-left: 5px solid #1f77b4;
-    }
-</style>
-""", unsafe_allow_html=True)
-
-# STEP 4: Configure Groq LLM with Rate Limiting
-@st.cache_resource
-def get_groq_llm(api_key):
-    return LLM(
-        model="groq/llama-3.1-8b-instant",
-        api_key=api_key,
-        max_tokens=1000,
-        temperature=0.1
-    )
-
-# STEP 5: Professional Document Formatter Class (adapted for Streamlit)
-class MultiAgentDocumentFormatter:
-    """
-    Professional Word Document Formatter for Multi-Agent Analysis Results
-    Creates executive-level reports with proper formatting and structure
-    """
-
-    def __init__(self):
-        self.document = Document()
-        self.setup_styles()
-
-    def setup_styles(self):
-        """Setup custom styles for professional document formatting"""
-        try:
-            # Title Style
-            title_style = self.document.styles.add_style('Custom Title', WD_STYLE_TYPE.PARAGRAPH)
-            title_font = title_style.font
-            title_font.name = 'Calibri'
-            title_font.size = Pt(24)
-            title_font.bold = True
-            title_style.paragraph_format.alignment = WD_ALIGN_PARAGRAPH.CENTER
-
-            # Heading Style
-            heading_style = self.document.styles.add_style('Custom Heading', WD_STYLE_TYPE.PARAGRAPH)
-            heading_font = heading_style.font
-            heading_font.name = 'Calibri'
-            heading_font.size = Pt(16)
-            heading_font.bold = True
-
-            # Body Style
-            body_style = self.document.styles.add_style('Custom Body', WD_STYLE_TYPE.PARAGRAPH)
-            body_font = body_style.font
-            body_font.name = 'Calibri'
-            body_font.size = Pt(11)
-
-        except Exception as e:
-            st.warning(f"Style setup note: {e}")
-
-    def add_header(self, title, query, timestamp):
-        """Add professional document header"""
-        # Main Title
-        title_para = self.document.add_paragraph()
-        title_run = title_para.add_run(title)
-        title_run.font.name = 'Calibri'
-        title_run.font.size = Pt(20)
-        title_run.bold = True
-        title_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-
-        # Add spacing
-        self.document.add_paragraph()
-
-        # Query Information
-        query_label = self.document.add_paragraph()
-        query_label.add_run("Analysis Query:").bold = True
-        query_para = self.document.add_paragraph(f'"{query}"')
-        query_para.italic = True
-
-        # Timestamp
-        time_label = self.document.add_paragraph()
-        time_label.add_run("Generated:").bold = True
-        self.document.add_paragraph(timestamp)
-
-        # Analysis Information
-        method_label = self.document.add_paragraph()
-        method_label.add_run("Analysis Method:").bold = True
-        self.document.add_paragraph("Hybrid Multi-Agent System (Research → Analysis → Synthesis)")
-
-        # Add separator line
-        self.document.add_paragraph("_" * 80)
-        self.document.add_paragraph()
-
-    def add_section(self, heading, content, is_main_section=True):
-        """Add formatted section with heading and content"""
-        if is_main_section:
-            heading_para = self.document.add_paragraph()
-            heading_run = heading_para.add_run(heading)
-            heading_run.font.name = 'Calibri'
-            heading_run.font.size = Pt(14)
-            heading_run.bold = True
-        else:
-            heading_para = self.document.add_paragraph()
-            heading_run = heading_para.add_run(heading)
-            heading_run.font.name = 'Calibri'
-            heading_run.font.size = Pt(12)
-            heading_run.bold = True
-
-        # Format content with proper paragraphs
-        content_lines = str(content).split('\n')
-        for line in content_lines:
-            if line.strip():
-                para = self.document.add_paragraph(line.strip())
-                para.style.font.name = 'Calibri'
-                para.style.font.size = Pt(11)
-
-        # Add spacing after section
-        self.document.add_paragraph()
-
-    def add_executive_summary_box(self, summary):
-        """Add highlighted executive summary box"""
-        # Add Executive Summary Header
-        summary_heading = self.document.add_paragraph()
-        summary_run = summary_heading.add_run("🎯 EXECUTIVE SUMMARY")
-        summary_run.font.name = 'Calibri'
-        summary_run.font.size = Pt(14)
-        summary_run.bold = True
-
-        # Add summary content
-        for line in str(summary).split('\n'):
-            if line.strip():
-                summary_para = self.document.add_paragraph(line.strip())
-                summary_para.style.font.name = 'Calibri'
-                summary_para.style.font.size = Pt(12)
-
-        self.document.add_paragraph("_" * 80)
-        self.document.add_paragraph()
-
-    def get_document_bytes(self):
-        """Return document as bytes for download"""
-        bio = BytesIO()
-        self.document.save(bio)
-        bio.seek(0)
-        return bio.getvalue()
-
-# STEP 6: Define Specialized Agents with Rate Limiting
-@st.cache_resource
-def create_agents(api_key):
-    groq_llm = get_groq_llm(api_key)
-
-    # RESEARCH AGENT
-    research_agent = Agent(
-        role='Senior Research Specialist',
-        goal='Conduct comprehensive research using available knowledge and provide structured findings',
-        backstory="""You are an expert researcher with vast knowledge across multiple domains.
-        You excel at analyzing questions, breaking them down into key components, and providing
-        comprehensive information based on your extensive knowledge base. You organize findings
-        clearly with proper sections and provide valuable context and insights.""",
-        verbose=False,
-        allow_delegation=False,
-        llm=groq_llm,
-        max_iter=2,
-        max_rpm=10
-    )
-
-    # ANALYSIS AGENT
-    analysis_agent = Agent(
-        role='Senior Data Analyst and Strategic Advisor',
-        goal='Perform comprehensive analysis and provide actionable insights and recommendations',
-        backstory="""You are a world-class analyst with expertise in:
-        - Statistical analysis and trend identification
-        - Pattern recognition and anomaly detection
-        - Financial analysis and risk assessment
-        - Strategic thinking and decision support
-        - Predictive analysis and forecasting
-        - Text analytics and sentiment analysis
-        You synthesize information into clear, actionable insights and strategic recommendations.""",
-        verbose=False,
-        allow_delegation=False,
-        llm=groq_llm,
-        max_iter=2,
-        max_rpm=10
-    )
-
-    # ORCHESTRATOR AGENT
-    orchestrator_agent = Agent(
-        role='Chief Orchestrator and Synthesis Expert',
-        goal='Coordinate workflows and synthesize comprehensive executive-level reports',
-        backstory="""You are a master coordinator and executive advisor who excels at:
-        - Managing complex multi-step analyses
-        - Synthesizing diverse information sources
-        - Creating executive-level summaries and reports
-        - Providing strategic recommendations and roadmaps
-        - Ensuring comprehensive coverage of all aspects
-        - Risk assessment and implementation planning
-        You deliver clear, well-structured, actionable final reports suitable for C-level executives.""",
-        verbose=False,
-        allow_delegation=False,
-        llm=groq_llm,
-        max_iter=2,
-        max_rpm=10
-    )
-
-    return research_agent, analysis_agent, orchestrator_agent
-
-# STEP 7: Define Enhanced Tasks for Document Formatting
-def create_research_task(user_query):
-    return Task(
-        description=f"""
-        Conduct comprehensive research and analysis on: "{user_query}"
-
-        Your research must include the following structured sections:
-
-        1. KEY FINDINGS:
-        - Most important facts and current information
-        - Critical statistics and quantitative data
-        - Recent developments and updates
-
-        2. CONTEXTUAL BACKGROUND:
-        - Relevant historical context
-        - Industry or domain background
-        - Important stakeholders and players
-
-        3. MULTIPLE PERSPECTIVES:
-        - Different viewpoints and opinions
-        - Contrasting approaches or solutions
-        - Expert opinions and insights
-
-        4. CURRENT TRENDS:
-        - Latest developments and movements
-        - Emerging patterns and shifts
-        - Future indicators and signals
-
-        Structure your response with clear section headers for professional document formatting.
-        Keep each section concise but comprehensive to manage token limits effectively.
-        """,
-        agent=None,
-        expected_output="Well-structured research report with 4 distinct sections: Key Findings, Contextual Background, Multiple Perspectives, and Current Trends (max 800 words)"
-    )
-
-def create_analysis_task(user_query, research_results=None):
-    research_context = f"\n\nRESEARCH CONTEXT:\n{research_results}" if research_results else ""
-
-    return Task(
-        description=f"""
-        Perform comprehensive multi-dimensional analysis on: "{user_query}"{research_context}
-
-        Provide thorough analysis organized in these exact sections:
-
-        1. QUANTITATIVE INSIGHTS:
-        - Statistical analysis of numerical data
-        - Trend identification and pattern recognition
-        - Comparative analysis and benchmarking
-        - Growth rates, percentages, and key metrics
-
-        2. QUALITATIVE ANALYSIS:
-        - Strategic implications and significance
-        - Opportunities and potential benefits
-        - Challenges and obstacles identified
-        - Quality factors and subjective assessments
-
-        3. RISK ASSESSMENT:
-        - Potential risks and uncertainties
-        - Probability and impact evaluation
-        - Mitigation strategies and safeguards
-        - Contingency considerations
-
-        4. PREDICTIVE ANALYSIS:
-        - Future trends and forecasting
-        - Scenario planning and projections
-        - Expected outcomes and timelines
-        - Leading indicators to monitor
-
-        5. STRATEGIC RECOMMENDATIONS:
-        - Top 3-5 actionable recommendations
-        - Priority ranking and implementation sequence
-        - Resource requirements and success metrics
-        - Expected ROI and impact assessment
-
-        Use clear section headers and bullet points for professional document formatting.
-        """,
-        agent=None,
-        expected_output="Comprehensive analysis with 5 sections: Quantitative Insights, Qualitative Analysis, Risk Assessment, Predictive Analysis, and Strategic Recommendations (max 800 words)"
-    )
-
-def create_orchestration_task(user_query, research_data, analysis_data):
-    return Task(
-        description=f"""
-        Create an executive-level synthesis report for: "{user_query}"
-
-        Synthesize and coordinate the following information:
-
-        RESEARCH DATA:
-        {research_data}
-
-        ANALYSIS DATA:
-        {analysis_data}
-
-        Create a comprehensive executive report with these EXACT sections:
-
-        1. EXECUTIVE SUMMARY:
-        - 3-4 key sentences summarizing the entire analysis
-        - Most critical insights and conclusions
-        - Primary recommendation or course of action
-
-        2. KEY FINDINGS:
-        - Top 5 most important discoveries from research and analysis
-        - Critical facts that drive decision-making
-        - Validated insights with supporting evidence
-
-        3. STRATEGIC RECOMMENDATIONS:
-        - Top 3 priority actions ranked by importance
-        - Clear implementation steps for each recommendation
-        - Expected outcomes and success measures
-
-        4. IMPLEMENTATION ROADMAP:
-        - Specific next steps with timelines
-        - Resource requirements and responsibilities
-        - Milestones and checkpoints
-        - Dependencies and prerequisites
-
-        5. RISK CONSIDERATIONS:
-        - Major risks and potential obstacles
-        - Impact assessment and probability
-        - Mitigation strategies and contingency plans
-
-        6. CONCLUSION:
-        - Final strategic assessment and outlook
-        - Success factors and critical requirements
-        - Long-term implications and considerations
-
-        Ensure professional formatting with clear headers, bullet points, and executive-level language.
-        """,
-        agent=None,
-        expected_output="Executive-level comprehensive report with 6 distinct sections: Executive Summary, Key Findings, Strategic Recommendations, Implementation Roadmap, Risk Considerations, and Conclusion"
-    )
-
-# STEP 8: Enhanced Multi-Agent System with DOCX Export
-def run_hybrid_multi_agent_analysis_with_docx(user_query, api_key, export_to_docx=True):
-    """
-    Execute complete hybrid multi-agent workflow with professional DOCX export
-    Returns results dict and optional docx bytes
-    """
-
-    status_placeholder = st.empty()
-    status_placeholder.info(f"🚀 Starting Enhanced Hybrid Multi-Agent Analysis...")
-    status_placeholder.info(f"📝 Query: {user_query}")
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    status_placeholder.info(f"⏰ Started at: {timestamp}")
-    status_placeholder.info(f"📄 DOCX Export: {'Enabled' if export_to_docx else 'Disabled'}")
-    status_placeholder.info(f"⚠️ Rate Limiting: Conservative 8 RPM per phase")
-
-    try:
-        research_agent, analysis_agent, orchestrator_agent = create_agents(api_key)
-
-        # Phase 1: Research Agent
-        status_placeholder.info("\n🔍 PHASE 1: Research Agent - Information Gathering")
-        status_placeholder.info("Status: Conducting comprehensive research...")
-
-        research_task = create_research_task(user_query)
-        research_task.agent = research_agent
-        research_crew = Crew(
-            agents=[research_agent],
-            tasks=[research_task],
-            process=Process.sequential,
-            verbose=False,
-            max_rpm=8
-        )
-
-        with st.spinner('Research in progress...'):
-            research_results = research_crew.kickoff()
-        status_placeholder.success(f"✅ Research Phase Complete - {len(str(research_results))} characters generated")
-
-        # Rate limiting delay
-        status_placeholder.info("⏳ Rate limit management: Waiting 10 seconds...")
-        time.sleep(10)
-
-        # Phase 2: Analysis Agent
-        status_placeholder.info("\n📊 PHASE 2: Analysis Agent - Comprehensive Analysis")
-        status_placeholder.info("Status: Performing multi-dimensional analysis...")
-
-        analysis_task = create_analysis_task(user_query, str(research_results))
-        analysis_task.agent = analysis_agent
-        analysis_crew = Crew(
-            agents=[analysis_agent],
-            tasks=[analysis_task],
-            process=Process.sequential,
-            verbose=False,
-            max_rpm=8
-        )
-
-        with st.spinner('Analysis in progress...'):
-            analysis_results = analysis_crew.kickoff()
-        status_placeholder.success(f"✅ Analysis Phase Complete - {len(str(analysis_results))} characters generated")
-
-        # Rate limiting delay
-        status_placeholder.info("⏳ Rate limit management: Waiting 10 seconds...")
-        time.sleep(10)
-
-        # Phase 3: Orchestrator Agent
-        status_placeholder.info("\n🎯 PHASE 3: Orchestrator Agent - Executive Synthesis")
-        status_placeholder.info("Status: Creating executive-level comprehensive report...")
-
-        orchestration_task = create_orchestration_task(user_query, str(research_results), str(analysis_results))
-        orchestration_task.agent = orchestrator_agent
-        orchestration_crew = Crew(
-            agents=[orchestrator_agent],
-            tasks=[orchestration_task],
-            process=Process.sequential,
-            verbose=False,
-            max_rpm=8
-        )
-
-        with st.spinner('Synthesis in progress...'):
-            final_results = orchestration_crew.kickoff()
-        status_placeholder.success(f"✅ Orchestration Phase Complete - {len(str(final_results))} characters generated")
-
-        status_placeholder.success("✅ HYBRID MULTI-AGENT ANALYSIS COMPLETE")
-        status_placeholder.info(f"⏰ Completed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-
-        # Compile results
-        results = {
-            'query': user_query,
-            'timestamp': timestamp,
-            'research': research_results,
-            'analysis': analysis_results,
-            'final_report': final_results
-        }
-
-        # DOCX Export Phase
-        docx_bytes = None
-        if export_to_docx:
-            status_placeholder.info("\n📄 PHASE 4: Professional Document Generation")
-            status_placeholder.info("Status: Creating Word document with executive formatting...")
-            try:
-                docx_bytes = create_docx_bytes(results)
-                results['docx_bytes'] = docx_bytes
-                status_placeholder.success("✅ DOCX Export Complete")
-            except Exception as e:
-                status_placeholder.error(f"⚠️ DOCX Export Error: {e}")
-                status_placeholder.info("📋 Analysis results still available as text output")
-
-        return results, docx_bytes
-
-    except Exception as e:
-        error_msg = str(e).lower()
-        if "rate_limit" in error_msg or "429" in error_msg:
-            st.error(f"🚨 RATE LIMIT ERROR: {e}")
-            st.info("""
-            💡 SOLUTIONS:
-            1. Wait 60 seconds and try again
-            2. Use a shorter, simpler query
-            3. Consider upgrading your Groq plan for higher limits
-            """)
-            return {"error": "rate_limit", "message": str(e)}, None
-        else:
-            st.error(f"🚨 SYSTEM ERROR: {e}")
-            st.info("""
-            💡 TROUBLESHOOTING:
-            1. Check your internet connection
-            2. Verify your Groq API key is valid
-            3. Try restarting the app if issues persist
-            """)
-            return {"error": "system", "message": str(e)}, None
-
-# STEP 9: Professional DOCX Report Generator
-def create_docx_bytes(results):
-    """
-    Generate a professional Word document from multi-agent analysis results
-    Returns bytes for download
-    """
-
-    try:
-        st.info("Creating document structure...")
-        formatter = MultiAgentDocumentFormatter()
-
-        # Document Header with Title and Metadata
-        formatter.add_header(
-            title="MULTI-AGENT INTELLIGENCE ANALYSIS REPORT",
-            query=results['query'],
-            timestamp=results['timestamp']
-        )
-
-        # Extract and format Executive Summary
-        final_report = str(results['final_report'])
-        if "EXECUTIVE SUMMARY" in final_report.upper():
-            try:
-                summary_start = final_report.upper().find("EXECUTIVE SUMMARY")
-                summary_content = final_report[summary_start:summary_start+500]
-                lines = summary_content.split('\n')
-                clean_summary = []
-                for line in lines[1:6]:
-                    if line.strip() and not line.upper().startswith(('KEY FINDINGS', 'STRATEGIC')):
-                        clean_summary.append(line.strip())
-
-                if clean_summary:
-                    formatter.add_executive_summary_box(' '.join(clean_summary))
-            except:
-                formatter.add_executive_summary_box("Executive summary extracted from comprehensive analysis below.")
-
-        # Research Findings Section
-        formatter.add_section("🔍 RESEARCH FINDINGS & INTELLIGENCE", results['research'])
-
-        # Analysis Section
-        formatter.add_section("📊 COMPREHENSIVE ANALYSIS & INSIGHTS", results['analysis'])
-
-        # Final Executive Report
-        formatter.add_section("🎯 EXECUTIVE SYNTHESIS & RECOMMENDATIONS", results['final_report'])
-
-        # System Information Footer
-        system_info = f"""Analysis Framework: Hybrid Multi-Agent Intelligence System
-Research Agent: Senior Research Specialist with domain expertise
-Analysis Agent: Senior Data Analyst and Strategic Advisor
-Orchestrator Agent: Chief Synthesis Expert and Executive Advisor
-LLM Technology: Groq Llama-3.1-8B-Instant
-Processing Method: Sequential multi-phase analysis with rate limiting
-Document Generated: {results['timestamp']}
-Total Processing Time: ~3-4 minutes including safety delays"""
-
-        formatter.add_section("ℹ️ SYSTEM METADATA", system_info, is_main_section=False)
-
-        # Generate timestamped filename
-        safe_query = ''.join(c for c in results['query'][:30] if c.isalnum() or c in (' ', '-', '_')).strip()
-        safe_query = safe_query.replace(' ', '_')
-        timestamp_str = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"Multi_Agent_Analysis_{safe_query}_{timestamp_str}.docx"
-
-        # Get bytes
-        docx_bytes = formatter.get_document_bytes()
-        st.success("✅ Professional Word document created successfully")
-        return docx_bytes, filename
-
-    except Exception as e:
-        st.error(f"⚠️ DOCX Generation Error: {e}")
-        st.info("📋 Analysis results are still available as text output below")
-        st.info("💡 You can manually copy the text results if needed")
-        return None, None
-
-# Main Streamlit App
-def main():
-    st.markdown('<h1 class="main-header">🤖 Multi-Agent AI Analysis System</h1>', unsafe_allow_html=True)
-    st.markdown('<p style="text-align: center; color: #666;">Professional Intelligence Analysis with Executive Reporting</p>', unsafe_allow_html=True)
-
-    # Sidebar for API Key
-    st.sidebar.header("🔑 Configuration")
-    api_key = st.sidebar.text_input("Groq API Key", type="password", help="Enter your Groq API key (starts with 'gsk_')")
-    # For production, uncomment the next line and use secrets
-    # api_key = st.secrets.get("GROQ_API_KEY", "")
-
-    export_docx = st.sidebar.checkbox("📄 Generate DOCX Report", value=True, help="Create professional Word document for download")
-
-    # Demo Query Option
-    use_demo = st.sidebar.checkbox("🎯 Use Demo Query", value=False)
-    if use_demo:
-        default_query = "What are the top 3 emerging AI trends for 2025 and their business impact?"
-    else:
-        default_query = ""
-
-    # Main Query Input
-    st.markdown('<h2 class="sub-header">📝 Enter Your Analysis Query</h2>', unsafe_allow_html=True)
-    user_query = st.text_area(
-        "What would you like to analyze?",
-        value=default_query,
-        height=100,
-        placeholder="e.g., What are the key investment opportunities in renewable energy?"
-    )
-
-    # Run Button
-    if st.button("🚀 Run Multi-Agent Analysis", type="primary", disabled=not api_key or not user_query.strip()):
-        if not api_key:
-            st.warning("⚠️ Please enter your Groq API key in the sidebar.")
-            return
-        if not user_query.strip():
-            st.warning("⚠️ Please enter a query.")
-            return
-
-        # Progress Bar
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-
-        # Run Analysis
-        with st.spinner("Initiating multi-agent workflow..."):
-            results, docx_data = run_hybrid_multi_agent_analysis_with_docx(user_query, api_key, export_docx)
-
-        if 'error' not in results:
-            st.success("✅ Analysis Complete! View results below.")
-
-            # Display Results
-            col1, col2 = st.columns(2)
-
-            with col1:
-                st.markdown('<h3 class="sub-header">🔍 Research Findings</h3>', unsafe_allow_html=True)
-                st.markdown(f'<div class="status-box">{results["research"]}</div>', unsafe_allow_html=True)
-
-                st.markdown('<h3 class="sub-header">📊 Analysis Insights</h3>', unsafe_allow_html=True)
-                st.markdown(f'<div class="status-box">{results["analysis"]}</div>', unsafe_allow_html=True)
-
-            with col2:
-                st.markdown('<h3 class="sub-header">🎯 Executive Report</h3>', unsafe_allow_html=True)
-                st.markdown(f'<div class="status-box">{results["final_report"]}</div>', unsafe_allow_html=True)
-
-            # Download DOCX
-            if docx_data and export_docx:
-                docx_bytes, filename = docx_data
-                st.download_button(
-                    label="📥 Download Professional DOCX Report",
-                    data=docx_bytes,
-                    file_name=filename,
-                    mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                    help="Download the executive-level Word document"
-                )
-
-            # Example Queries
-            st.markdown("---")
-            st.markdown('<h4 class="sub-header">💡 Example Queries to Try</h4>', unsafe_allow_html=True)
-            examples = [
-                "What are the key investment opportunities in renewable energy?",
-                "How will AI impact the Indian financial sector by 2025?",
-                "What are the risks and benefits of cryptocurrency adoption?",
-                "Analyze the future of remote work and its business implications"
-            ]
-            for example in examples:
-                if st.button(example, key=example):
-                    st.rerun()
-
-        else:
-            st.error(f"❌ Error: {results.get('message', 'Unknown error')}")
-            if results.get('error') == 'rate_limit':
-                st.info("💡 This is normal with free Groq tier - wait 60 seconds and try again")
-
-    # Instructions
-    with st.expander("ℹ️ How to Use & Deploy", expanded=False):
-        st.markdown("""
-        ### Usage Instructions
-        1. **Enter Groq API Key**: In the sidebar (get one from [Groq Console](https://console.groq.com)).
-        2. **Input Query**: Describe what you want to analyze.
-        3. **Run Analysis**: Click the button to start the 3-phase multi-agent process.
-        4. **View Results**: See structured outputs in columns.
-        5. **Download DOCX**: Get a professional Word report if enabled.
-
-        ### Notes
-        - Analysis takes ~3-4 minutes due to rate limiting.
-        - Verbose output is disabled to keep the UI clean.
-        - Handles errors gracefully with troubleshooting tips.
-        - SQLite patched with pysqlite3-binary to meet ChromaDB requirements.
-        """)
-
-if __name__ == "__main__":
-    main()
-
+import streamlit as st
+import os
+import warnings
+import time
+import asyncio
+import hashlib
+import threading
+import queue
+from datetime import datetime
+from collections import deque
+import io
+from io import BytesIO
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+warnings.filterwarnings('ignore')
+
+# FIX FOR CHROMADB/SQLITE3
+try:
+    import sys
+    import pysqlite3
+    sys.modules['sqlite3'] = sys.modules.pop('pysqlite3')
+    import sqlite3
+    st.info(f"✅ SQLite patched to version: {sqlite3.sqlite_version}")
+except ImportError:
+    st.error("❌ pysqlite3-binary not installed. Add to requirements.txt.")
+
+# Import Required Libraries
+# CrewAI, LiteLLM and python-docx are imported where they are used, so the page
+# renders before their (multi-second) import cost is paid on the first analysis
+import json
+import re
+import string
+
+# Token counting for prompt compression (falls back to a character estimate)
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Configure Streamlit Page
+st.set_page_config(
+    page_title="Multi-Agent AI Analysis System",
+    page_icon="🤖",
+    layout="wide"
+)
+
+# Custom CSS for professional look
+# Minified to shrink the per-rerun payload; Streamlit drops elements a rerun does not re-send, so inject every run
+_CSS = "<style>" + "".join(line.strip() for line in """
+    .main-header {
+        font-size: 2.5em;
+        font-weight: bold;
+        text-align: center;
+        color: #1f77b4;
+        margin-bottom: 0.5em;
+    }
+    .sub-header {
+        font-size: 1.5em;
+        font-weight: bold;
+        color: #ff7f0e;
+        margin-bottom: 1em;
+    }
+    .status-box {
+        background-color: #f0f2f6;
+        padding: 1em;
+        border-radius: 0.5em;
+        border-left: 5px solid #1f77b4;
+    }
+""".splitlines()) + "</style>"
+
+def inject_css():
+    st.markdown(_CSS, unsafe_allow_html=True)
+
+inject_css()
+
+# STEP 4: Configure Groq LLM with Rate Limiting
+@st.cache_resource(show_spinner=False)
+def get_http_client():
+    """
+    Pooled keep-alive HTTP client shared by every Groq call across reruns and sessions
+    Uses HTTP/2 when the optional h2 package is installed, so concurrent phases share one connection
+    The pool is sized for many concurrent sessions (four calls each); only idle keep-alives are capped
+    """
+    import importlib.util
+    import httpx
+    from litellm.llms.custom_httpx.http_handler import HTTPHandler
+
+    return HTTPHandler(
+        client=httpx.Client(
+            http2=importlib.util.find_spec("h2") is not None,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=8),
+            timeout=httpx.Timeout(timeout=600.0, connect=5.0)
+        )
+    )
+
+GROQ_MODEL = "groq/llama-3.1-8b-instant"
+
+# Request settings shared by every Groq call; only the key and token budget vary.
+# Greedy, seeded decoding so identical prompts give identical (cacheable) outputs
+_LLM_SETTINGS = {
+    "model": GROQ_MODEL,
+    "temperature": 0.0,
+    "top_p": 1.0,
+    "seed": 42,
+    "stream": True,
+    "num_retries": 2
+}
+
+# Lifetime of every cached resource and phase output
+CACHE_TTL = 86400
+# Bound for resources cached per API key, so keys from past sessions don't pile up
+KEY_CACHE_MAX_ENTRIES = 16
+
+@st.cache_resource(max_entries=4 * KEY_CACHE_MAX_ENTRIES, ttl=CACHE_TTL, show_spinner=False)  # the four *_MAX_TOKENS budgets per key
+def get_groq_llm(api_key, max_tokens=1000):
+    from crewai.llm import LLM
+
+    return LLM(
+        **_LLM_SETTINGS,
+        api_key=api_key,
+        max_tokens=max_tokens,
+        client=get_http_client()
+    )
+
+# STEP 5: Professional Document Formatter Class (adapted for Streamlit)
+@st.cache_resource(show_spinner=False)
+def get_document_template():
+    """Blank document with the body font configured, serialized once and reused"""
+    from docx import Document
+    from docx.shared import Pt
+
+    document = Document()
+    # Body text font, set once on the Normal style every paragraph inherits
+    body_font = document.styles['Normal'].font
+    body_font.name = 'Calibri'
+    body_font.size = Pt(11)
+    bio = BytesIO()
+    document.save(bio)
+    return bio.getvalue()
+
+class MultiAgentDocumentFormatter:
+    """
+    Professional Word Document Formatter for Multi-Agent Analysis Results
+    Creates executive-level reports with proper formatting and structure
+    """
+
+    def __init__(self):
+        from docx import Document
+
+        self.document = Document(BytesIO(get_document_template()))
+
+    def add_header(self, title, query, timestamp, method):
+        """Add professional document header"""
+        from docx.shared import Pt
+        from docx.enum.text import WD_ALIGN_PARAGRAPH
+
+        # Main Title
+        title_para = self.document.add_paragraph()
+        title_run = title_para.add_run(title)
+        title_run.font.name = 'Calibri'
+        title_run.font.size = Pt(20)
+        title_run.bold = True
+        title_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+        # Add spacing
+        self.document.add_paragraph()
+
+        # Query Information
+        query_label = self.document.add_paragraph()
+        query_label.add_run("Analysis Query:").bold = True
+        query_para = self.document.add_paragraph(f'"{query}"')
+        query_para.italic = True
+
+        # Timestamp
+        time_label = self.document.add_paragraph()
+        time_label.add_run("Generated:").bold = True
+        self.document.add_paragraph(timestamp)
+
+        # Analysis Information
+        method_label = self.document.add_paragraph()
+        method_label.add_run("Analysis Method:").bold = True
+        self.document.add_paragraph(method)
+
+        # Add separator line
+        self.document.add_paragraph("_" * 80)
+        self.document.add_paragraph()
+
+    def add_section(self, heading, content, is_main_section=True):
+        """Add formatted section with heading and content"""
+        from docx.shared import Pt
+
+        if is_main_section:
+            heading_para = self.document.add_paragraph()
+            heading_run = heading_para.add_run(heading)
+            heading_run.font.name = 'Calibri'
+            heading_run.font.size = Pt(14)
+            heading_run.bold = True
+        else:
+            heading_para = self.document.add_paragraph()
+            heading_run = heading_para.add_run(heading)
+            heading_run.font.name = 'Calibri'
+            heading_run.font.size = Pt(12)
+            heading_run.bold = True
+
+        # Format content as a single paragraph of lines
+        self.add_lines(content)
+
+        # Add spacing after section
+        self.document.add_paragraph()
+
+    def add_lines(self, text):
+        """Add the non-empty lines of text as one paragraph joined by line breaks"""
+        lines = [line.strip() for line in str(text).splitlines() if line.strip()]
+        if not lines:
+            return
+        para = self.document.add_paragraph(lines[0])
+        for line in lines[1:]:
+            run = para.add_run()
+            run.add_break()
+            run.add_text(line)
+
+    def add_executive_summary_box(self, summary):
+        """Add highlighted executive summary box"""
+        from docx.shared import Pt
+
+        # Add Executive Summary Header
+        summary_heading = self.document.add_paragraph()
+        summary_run = summary_heading.add_run("🎯 EXECUTIVE SUMMARY")
+        summary_run.font.name = 'Calibri'
+        summary_run.font.size = Pt(14)
+        summary_run.bold = True
+
+        # Add summary content
+        self.add_lines(summary)
+
+        self.document.add_paragraph("_" * 80)
+        self.document.add_paragraph()
+
+    def get_document_buffer(self):
+        """Return document as an in-memory buffer for download"""
+        bio = BytesIO()
+        self.document.save(bio)
+        bio.seek(0)
+        return bio
+
+# STEP 6: Define Specialized Agents with Rate Limiting
+# Agent backstories, kept short: they are sent as the system prompt on every call
+_RESEARCH_BACKSTORY = (
+    "Expert researcher across many domains. "
+    "You break questions into key components and organize findings into clear sections with useful context and insights."
+)
+_ANALYSIS_BACKSTORY = (
+    "World-class analyst in statistics, trends, patterns, financial and risk analysis, strategy and forecasting. "
+    "You turn information into clear, actionable insights and recommendations."
+)
+_ORCHESTRATOR_BACKSTORY = (
+    "Master coordinator and executive advisor. "
+    "You synthesize diverse inputs into clear, well-structured, actionable reports for C-level executives, covering recommendations, roadmaps and risks."
+)
+_FUSED_BACKSTORY = (
+    "Senior researcher, analyst and executive advisor in one. "
+    "You gather key facts, turn them into actionable analysis, and deliver clear reports for C-level executives."
+)
+
+# Focused research sub-agents, run concurrently; their outputs are joined in this order
+RESEARCH_FOCI = {
+    'tech': {
+        'role': 'Research Specialist - Key Facts and Technology',
+        'goal': 'Gather the most important facts, statistics and recent developments',
+        'sections': """1. KEY FINDINGS:
+- Most important facts and current information
+- Critical statistics and quantitative data
+- Recent developments and updates"""
+    },
+    'business': {
+        'role': 'Research Specialist - Business Context and Perspectives',
+        'goal': 'Lay out the background, stakeholders and competing viewpoints',
+        'sections': """2. CONTEXTUAL BACKGROUND:
+- Relevant historical context
+- Industry or domain background
+- Important stakeholders and players
+
+3. MULTIPLE PERSPECTIVES:
+- Different viewpoints and opinions
+- Contrasting approaches or solutions
+- Expert opinions and insights"""
+    },
+    'trends': {
+        'role': 'Research Specialist - Trends and Signals',
+        'goal': 'Identify current trends, emerging shifts and future indicators',
+        'sections': """4. CURRENT TRENDS:
+- Latest developments and movements
+- Emerging patterns and shifts
+- Future indicators and signals"""
+    },
+}
+
+# Completion budget per phase, sized to what each phase's output actually needs
+RESEARCH_MAX_TOKENS = 400  # per research sub-agent
+ANALYSIS_MAX_TOKENS = 1000
+SUMMARY_MAX_TOKENS = 150  # the orchestrator only writes the executive summary
+FUSED_MAX_TOKENS = 2500  # all three parts in one completion
+
+@st.cache_resource(max_entries=KEY_CACHE_MAX_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def create_research_agents(api_key):
+    """Build the focused research sub-agents once per API key, keyed by focus"""
+    from crewai import Agent
+
+    return {
+        focus: Agent(
+            role=spec['role'],
+            goal=spec['goal'],
+            backstory=_RESEARCH_BACKSTORY,
+            verbose=False,
+            allow_delegation=False,
+            llm=get_groq_llm(api_key, max_tokens=RESEARCH_MAX_TOKENS),
+            max_iter=2
+        )
+        for focus, spec in RESEARCH_FOCI.items()
+    }
+
+@st.cache_resource(max_entries=KEY_CACHE_MAX_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def create_agents(api_key):
+    """
+    Build the analysis and orchestration agents once per API key and reuse them across reruns
+    A different key gets its own cache entry; the least recently used keys are evicted past KEY_CACHE_MAX_ENTRIES
+    """
+    from crewai import Agent
+
+    # ANALYSIS AGENT
+    analysis_agent = Agent(
+        role='Senior Data Analyst and Strategic Advisor',
+        goal='Perform comprehensive analysis and provide actionable insights and recommendations',
+        backstory=_ANALYSIS_BACKSTORY,
+        verbose=False,
+        allow_delegation=False,
+        llm=get_groq_llm(api_key, max_tokens=ANALYSIS_MAX_TOKENS),
+        max_iter=2
+    )
+
+    # ORCHESTRATOR AGENT
+    orchestrator_agent = Agent(
+        role='Chief Orchestrator and Synthesis Expert',
+        goal='Coordinate workflows and synthesize comprehensive executive-level reports',
+        backstory=_ORCHESTRATOR_BACKSTORY,
+        verbose=False,
+        allow_delegation=False,
+        llm=get_groq_llm(api_key, max_tokens=SUMMARY_MAX_TOKENS),
+        max_iter=2
+    )
+
+    return analysis_agent, orchestrator_agent
+
+@st.cache_resource(max_entries=KEY_CACHE_MAX_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def create_fused_agent(api_key):
+    """Single agent that covers research, analysis and synthesis in one completion"""
+    from crewai import Agent
+
+    return Agent(
+        role='Chief Research, Analysis and Synthesis Expert',
+        goal='Research a question, analyze it, and synthesize an executive-level report in a single pass',
+        backstory=_FUSED_BACKSTORY,
+        verbose=False,
+        allow_delegation=False,
+        llm=get_groq_llm(api_key, max_tokens=FUSED_MAX_TOKENS),
+        max_iter=2
+    )
+
+# STEP 7: Define Enhanced Tasks for Document Formatting
+# Task prompt templates, built once; only the query and upstream outputs vary per run
+_RESEARCH_TASK_TEMPLATE = """Conduct focused research on: "{query}"
+
+Cover only the following sections, with these exact headers:
+
+{sections}
+
+Structure your response with clear section headers for professional document formatting.
+Keep it concise (max 300 words) to manage token limits effectively.
+"""
+
+_ANALYSIS_TASK_TEMPLATE = """Perform comprehensive multi-dimensional analysis on: "{query}"
+
+Provide thorough analysis organized in these exact sections:
+
+1. QUANTITATIVE INSIGHTS:
+- Statistical analysis of numerical data
+- Trend identification and pattern recognition
+- Comparative analysis and benchmarking
+- Growth rates, percentages, and key metrics
+
+2. QUALITATIVE ANALYSIS:
+- Strategic implications and significance
+- Opportunities and potential benefits
+- Challenges and obstacles identified
+- Quality factors and subjective assessments
+
+3. RISK ASSESSMENT:
+- Potential risks and uncertainties
+- Probability and impact evaluation
+- Mitigation strategies and safeguards
+- Contingency considerations
+
+4. PREDICTIVE ANALYSIS:
+- Future trends and forecasting
+- Scenario planning and projections
+- Expected outcomes and timelines
+- Leading indicators to monitor
+
+5. STRATEGIC RECOMMENDATIONS:
+- Top 3-5 actionable recommendations
+- Priority ranking and implementation sequence
+- Resource requirements and success metrics
+- Expected ROI and impact assessment
+
+Use clear section headers and bullet points for professional document formatting.
+"""
+
+_SUMMARY_TASK_TEMPLATE = """Write the executive summary of a report on: "{query}"
+
+Base it on these report sections:
+
+{context}
+
+Reply with 3-4 sentences only: the overall conclusion, the most critical insights, and the
+primary recommendation or course of action. No headers or bullet points.
+"""
+
+_FUSED_TASK_TEMPLATE = """Research, analyze and synthesize an executive report on: "{query}"
+
+Deliver all three parts in ONE response, each wrapped in its tag exactly as shown:
+
+<research>
+KEY FINDINGS, CONTEXTUAL BACKGROUND, MULTIPLE PERSPECTIVES, CURRENT TRENDS
+</research>
+
+<analysis>
+QUANTITATIVE INSIGHTS, QUALITATIVE ANALYSIS, RISK ASSESSMENT, PREDICTIVE ANALYSIS,
+STRATEGIC RECOMMENDATIONS
+</analysis>
+
+<report>
+EXECUTIVE SUMMARY, KEY FINDINGS, STRATEGIC RECOMMENDATIONS, IMPLEMENTATION ROADMAP,
+RISK CONSIDERATIONS, CONCLUSION
+</report>
+
+Use the listed names as section headers inside each part, each header on its own line,
+with bullet points and executive-level language. Keep research and analysis concise (max 500 words each).
+"""
+
+def create_research_task(user_query, focus):
+    from crewai import Task
+
+    return Task(
+        description=_RESEARCH_TASK_TEMPLATE.format(query=user_query, sections=RESEARCH_FOCI[focus]['sections']),
+        agent=None,
+        expected_output="Concise research covering only the requested sections, under their exact headers (max 300 words)"
+    )
+
+def create_analysis_task(user_query):
+    from crewai import Task
+
+    return Task(
+        description=_ANALYSIS_TASK_TEMPLATE.format(query=user_query),
+        agent=None,
+        expected_output="Comprehensive analysis with 5 sections: Quantitative Insights, Qualitative Analysis, Risk Assessment, Predictive Analysis, and Strategic Recommendations (max 800 words)"
+    )
+
+def create_summary_task(user_query, context):
+    from crewai import Task
+
+    return Task(
+        description=_SUMMARY_TASK_TEMPLATE.format(query=user_query, context=context),
+        agent=None,
+        expected_output="A 3-4 sentence executive summary in plain prose"
+    )
+
+def create_fused_task(user_query):
+    from crewai import Task
+
+    return Task(
+        description=_FUSED_TASK_TEMPLATE.format(query=user_query),
+        agent=None,
+        expected_output="Three tagged parts: <research>...</research>, <analysis>...</analysis> and <report>...</report>, each with the listed section headers"
+    )
+
+_FUSED_SECTION_RES = {
+    key: re.compile(rf"<{tag}>([\s\S]*?)</{tag}>", re.IGNORECASE)
+    for key, tag in (('research', 'research'), ('analysis', 'analysis'), ('final_report', 'report'))
+}
+
+def parse_fused_output(text):
+    """Split a fused completion into its three parts; None if any tag is missing"""
+    sections = {}
+    for key, pattern in _FUSED_SECTION_RES.items():
+        match = pattern.search(text)
+        if not match or not match.group(1).strip():
+            return None
+        sections[key] = match.group(1).strip()
+    return sections
+
+class FusedOutputError(ValueError):
+    """A fused completion lacked one of its tagged parts"""
+
+# Section headings used by the research, analysis and report prompts
+_SECTION_HEADINGS = (
+    'EXECUTIVE SUMMARY', 'KEY FINDINGS', 'CONTEXTUAL BACKGROUND', 'MULTIPLE PERSPECTIVES', 'CURRENT TRENDS',
+    'QUANTITATIVE INSIGHTS', 'QUALITATIVE ANALYSIS', 'RISK ASSESSMENT', 'PREDICTIVE ANALYSIS',
+    'STRATEGIC RECOMMENDATIONS', 'IMPLEMENTATION ROADMAP', 'RISK CONSIDERATIONS', 'CONCLUSION'
+)
+_HEADING_NAMES = '|'.join(h.replace(' ', r'[ \t]+') for h in _SECTION_HEADINGS)
+# A section heading after an optional markdown marker and "1." / "1)" / "IV." prefix: either alone on its
+# line ("2. KEY FINDINGS:", "**Key Findings**", "## 3. Risk Assessment"), or starting the body on its own
+# line when bold or uppercase ("**Executive Summary:** text", "EXECUTIVE SUMMARY: text")
+_SECTION_RE = re.compile(
+    r'^[ \t]*(?:[#*]+[ \t]*)?(?:(?:\d+|[IVXLC]+)[.)][ \t]*)?(?:'
+    r'\**[ \t]*(?P<alone>(?i:' + _HEADING_NAMES + r'))[ \t*#]*:?[ \t*]*$'
+    r'|\*\*[ \t]*(?P<bold>(?i:' + _HEADING_NAMES + r'))[ \t]*(?::[ \t]*\*\*|\*\*[ \t]*:)[ \t]*'
+    r'|(?P<upper>' + _HEADING_NAMES + r')[ \t]*:[ \t]*'
+    r')',
+    re.MULTILINE
+)
+
+def split_sections(text):
+    """Map each known section heading in text to its body; the first occurrence wins"""
+    matches = list(_SECTION_RE.finditer(text))
+    sections = {}
+    for match, following in zip(matches, matches[1:] + [None]):
+        heading = ' '.join(match.group(match.lastgroup).upper().split())
+        body = text[match.end():following.start() if following else len(text)].strip()
+        if body:
+            sections.setdefault(heading, body)
+    return sections
+
+def map_report_sections(research, analysis):
+    """
+    Labelled sections of the research and analysis outputs, for the executive-summary prompt
+    Every section found keeps its own heading, in prompt order
+    """
+    # Output without recognizable headings is kept whole under its main section
+    parts = (
+        split_sections(research) or {'KEY FINDINGS': research.strip()},
+        split_sections(analysis) or {'STRATEGIC RECOMMENDATIONS': analysis.strip()},
+    )
+    return {
+        heading: '\n\n'.join(part[heading] for part in parts if heading in part)
+        for heading in _SECTION_HEADINGS[1:]
+        if any(heading in part for part in parts)
+    }
+
+def synthesize_report(executive_summary):
+    """
+    Report text of the 3-phase path: the executive summary only
+    The research and analysis sections are shown and exported with the phase outputs, so they are not repeated
+    """
+    # Drop the heading if the model echoed it despite the prompt
+    summary = split_sections(executive_summary).get('EXECUTIVE SUMMARY', executive_summary)
+    return f"EXECUTIVE SUMMARY:\n{summary.strip()}"
+
+# STEP 7b: Cached Phase Runners
+# Bump when prompts or sampling settings change so cached phase outputs are invalidated
+PROMPT_VERSION = "v10"
+# Cached phase outputs kept across all sessions
+PHASE_CACHE_MAX_ENTRIES = 128
+
+def hash_api_key(api_key):
+    """Cache-key material for the API key so the raw secret is never hashed into cache entries"""
+    return hashlib.blake2b(api_key.encode()).hexdigest()[:16]
+
+@st.cache_resource(show_spinner=False)
+def get_stream_sinks():
+    """
+    Per-thread token sinks fed by a single CrewAI stream-chunk handler
+    It replaces CrewAI's default console handler, which prints every chunk to
+    stdout and keeps all of them in a process-wide buffer that is never reset
+    """
+    from crewai.events import crewai_event_bus, LLMStreamChunkEvent
+
+    sinks = threading.local()
+
+    def forward_stream_chunk(source, event):
+        sink = getattr(sinks, 'sink', None)
+        if sink:
+            sink(event.chunk)
+
+    crewai_event_bus._handlers[LLMStreamChunkEvent] = [forward_stream_chunk]
+    return sinks
+
+# Groq free-tier quota for llama-3.1-8b-instant
+GROQ_RPM_LIMIT = 30
+GROQ_TPM_LIMIT = 6000
+
+class GroqRateLimiter:
+    """
+    Sliding one-minute window over requests and tokens, shared by every crew on an API key
+    Blocks only when the next call would exceed the RPM or TPM quota
+    """
+
+    def __init__(self, rpm=GROQ_RPM_LIMIT, tpm=GROQ_TPM_LIMIT, window=60.0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.window = window
+        self.calls = deque()  # [monotonic timestamp, tokens] tickets
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens):
+        """Wait for room in the window; returns a ticket to settle with the actual usage"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                while self.calls and now - self.calls[0][0] >= self.window:
+                    self.calls.popleft()
+                used = sum(cost for _, cost in self.calls)
+                # An empty window always admits, so an oversize estimate cannot block forever
+                if not self.calls or (len(self.calls) < self.rpm and used + tokens <= self.tpm):
+                    ticket = [now, tokens]
+                    self.calls.append(ticket)
+                    return ticket
+                wait = self.window - (now - self.calls[0][0])
+            time.sleep(wait)
+
+    def settle(self, ticket, tokens):
+        """Replace a call's estimate with the tokens it actually used"""
+        with self.lock:
+            ticket[1] = tokens
+
+@st.cache_resource(max_entries=KEY_CACHE_MAX_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def get_rate_limiter(api_key_hash):
+    return GroqRateLimiter()
+
+@st.cache_resource(show_spinner=False)
+def get_token_encoder():
+    """cl100k tokenizer, a close enough count for llama; None when unavailable"""
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None  # Encoding file could not be downloaded
+
+# Token budget for the report sections injected into the executive summary prompt
+SUMMARY_CONTEXT_TOKENS = 1200
+# Report sections offered to the summary prompt, most important first
+_SUMMARY_SECTION_PRIORITY = (
+    'KEY FINDINGS', 'STRATEGIC RECOMMENDATIONS', 'RISK ASSESSMENT', 'PREDICTIVE ANALYSIS', 'QUANTITATIVE INSIGHTS',
+    'QUALITATIVE ANALYSIS', 'CURRENT TRENDS', 'CONTEXTUAL BACKGROUND', 'MULTIPLE PERSPECTIVES',
+    'IMPLEMENTATION ROADMAP', 'RISK CONSIDERATIONS', 'CONCLUSION'
+)
+
+def count_tokens(text):
+    """Token count of text, or a ~4 chars per token estimate without the tokenizer"""
+    encoder = get_token_encoder()
+    return len(encoder.encode(text)) if encoder else len(text) // 4
+
+def _compress(text, max_tokens=SUMMARY_CONTEXT_TOKENS):
+    """Keep the head and tail of text within max_tokens, dropping the middle"""
+    text = str(text)
+    encoder = get_token_encoder()
+    if encoder is None:
+        max_chars = max_tokens * 4
+        if len(text) <= max_chars:
+            return text
+        return text[:max_chars // 2].rstrip() + "\n...\n" + text[-(max_chars // 2):].lstrip()
+    tokens = encoder.encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    head, tail = tokens[:max_tokens // 2], tokens[-(max_tokens // 2):]
+    return encoder.decode(head).rstrip() + "\n...\n" + encoder.decode(tail).lstrip()
+
+def _fit(sections, max_tokens=SUMMARY_CONTEXT_TOKENS):
+    """
+    Join (heading, body) sections, most important first, within max_tokens
+    Whole lowest-priority sections are dropped first; a lone oversize section is compressed
+    """
+    blocks = [f"{heading}:\n{body}" for heading, body in sections if body]
+    while len(blocks) > 1 and count_tokens('\n\n'.join(blocks)) > max_tokens:
+        blocks.pop()
+    return _compress('\n\n'.join(blocks), max_tokens)
+
+def estimate_prompt_tokens(agent, task):
+    """Rough prompt size, ~4 chars per token"""
+    prompt_chars = len(agent.role) + len(agent.goal) + len(agent.backstory) + len(task.description)
+    return prompt_chars // 4
+
+def estimate_tokens(agent, task):
+    """Rough prompt size plus the completion budget"""
+    return estimate_prompt_tokens(agent, task) + (agent.llm.max_tokens or 0)
+
+# Research/analysis outputs shorter than this are treated as failed (error stubs, cut-off replies)
+MIN_PHASE_OUTPUT_CHARS = 200
+
+def require_output(text):
+    """Phase output text; raises (so it is never cached) when too short to be a real answer"""
+    text = text.strip()
+    if len(text) < MIN_PHASE_OUTPUT_CHARS:
+        raise ValueError(f"only {len(text)} characters returned")
+    return text
+
+def run_crew(agent, task, limiter, on_token=None):
+    """Run a single-agent crew and return its raw final answer, streaming tokens to on_token"""
+    from crewai import Crew, Process
+
+    task.agent = agent
+    crew = Crew(
+        agents=[agent],
+        tasks=[task],
+        process=Process.sequential,
+        verbose=False
+    )
+    ticket = limiter.acquire(estimate_tokens(agent, task))
+    sinks = get_stream_sinks()
+    sinks.sink = on_token
+    try:
+        output = crew.kickoff()
+    except Exception:
+        # No completion came back; keep only the prompt's share in the window before a retry
+        limiter.settle(ticket, estimate_prompt_tokens(agent, task))
+        raise
+    finally:
+        sinks.sink = None
+    if output.token_usage and output.token_usage.total_tokens:
+        limiter.settle(ticket, output.token_usage.total_tokens)
+    return output.raw
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=PHASE_CACHE_MAX_ENTRIES, show_spinner=False)
+def run_research_phase(user_query, focus, api_key_hash, prompt_version, model, _api_key, _on_token=None):
+    research_agent = create_research_agents(_api_key)[focus]
+    return require_output(
+        run_crew(research_agent, create_research_task(user_query, focus), get_rate_limiter(api_key_hash), _on_token)
+    )
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=PHASE_CACHE_MAX_ENTRIES, show_spinner=False)
+def run_analysis_phase(user_query, api_key_hash, prompt_version, model, _api_key, _on_token=None):
+    analysis_agent, _ = create_agents(_api_key)
+    return require_output(
+        run_crew(analysis_agent, create_analysis_task(user_query), get_rate_limiter(api_key_hash), _on_token)
+    )
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=PHASE_CACHE_MAX_ENTRIES, show_spinner=False)
+def run_orchestration_phase(user_query, research_results, analysis_results, api_key_hash, prompt_version, model, _api_key, _on_token=None):
+    """The executive summary over the mapped research and analysis sections, as the report text"""
+    _, orchestrator_agent = create_agents(_api_key)
+    sections = map_report_sections(research_results, analysis_results)
+    summary = run_crew(
+        orchestrator_agent,
+        create_summary_task(user_query, _fit((h, sections.get(h)) for h in _SUMMARY_SECTION_PRIORITY)),
+        get_rate_limiter(api_key_hash), _on_token
+    )
+    return synthesize_report(summary)
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=PHASE_CACHE_MAX_ENTRIES, show_spinner=False)
+def run_fused_phase(user_query, api_key_hash, prompt_version, model, _api_key, _on_token=None):
+    """The fused completion split into its three parts; raises (so it is never cached) if any is missing"""
+    sections = parse_fused_output(
+        run_crew(create_fused_agent(_api_key), create_fused_task(user_query), get_rate_limiter(api_key_hash), _on_token)
+    )
+    if sections is None:
+        raise FusedOutputError("fused response was missing sections")
+    return sections
+
+async def run_in_thread(func, *args):
+    """Await a blocking call in a worker thread that keeps the Streamlit script context"""
+    ctx = get_script_run_ctx()
+
+    def target():
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return func(*args)
+
+    return await asyncio.to_thread(target)
+
+# Groq 429 handling: retries on top of LiteLLM's own, waits capped per attempt
+RATE_LIMIT_RETRIES = 3
+MAX_RETRY_WAIT = 30
+
+def is_rate_limit_error(error):
+    error_msg = str(error).lower()
+    return "rate_limit" in error_msg or "429" in error_msg
+
+def retry_after_seconds(error, default=2.0):
+    """Server-advised wait from the Retry-After header of a 429, if present"""
+    headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+    try:
+        return float(headers.get('retry-after', default))
+    except (TypeError, ValueError):
+        return default
+
+async def run_with_backoff(func, *args):
+    """run_in_thread, retrying rate-limited calls with capped exponential backoff"""
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        try:
+            return await run_in_thread(func, *args)
+        except Exception as e:
+            if attempt == RATE_LIMIT_RETRIES or not is_rate_limit_error(e):
+                raise
+            await asyncio.sleep(min(retry_after_seconds(e) * 2 ** attempt, MAX_RETRY_WAIT))
+
+class PhaseError(Exception):
+    """A phase's crew failed; carries the phase name alongside the underlying error"""
+
+    def __init__(self, phase, error):
+        super().__init__(f"{phase} phase failed: {error}")
+        self.phase = phase
+        self.error = error
+
+async def run_streamed(phase, func, *args, interval=0.1):
+    """
+    run_with_backoff for a phase runner, previewing its streamed tokens live
+    Tokens are queued by the worker and rendered from the script thread, since
+    cached functions may not write to elements created outside them
+    Failures are raised as PhaseError naming the phase
+    """
+    tokens = queue.SimpleQueue()
+    preview = st.empty()
+
+    def attempt(*args):
+        tokens.put(None)  # marks the start of each (re)try
+        return func(*args)
+
+    call = asyncio.ensure_future(run_with_backoff(attempt, *args, tokens.put))
+    text = ''
+    while not call.done():
+        await asyncio.wait({call}, timeout=interval)
+        received = []
+        while not tokens.empty():
+            chunk = tokens.get_nowait()
+            if chunk is None:
+                # A new attempt: drop the failed attempt's partial output
+                received, text = [], ''
+                preview.empty()
+            else:
+                received.append(chunk)
+        if received:
+            text += ''.join(received)
+            preview.markdown(text.split('Final Answer:', 1)[-1])
+    preview.empty()
+    try:
+        return call.result()
+    except Exception as e:
+        raise PhaseError(phase, e) from e
+
+# STEP 8: Enhanced Multi-Agent System with DOCX Export
+async def run_three_phase_pipeline(user_query, api_key, api_key_hash, status):
+    """
+    Research sub-agents and the Analysis crew in parallel, then the Synthesis crew over both
+    Returns research, analysis, report and a note per phase that failed; if any did,
+    synthesis is skipped and the report says so, keeping the phases that succeeded
+    """
+    # Phases 1-2: Research and Analysis Agents (independent - both need only the query)
+    status.update(label=f"🔍📊 Phases 1-2: Research ({', '.join(RESEARCH_FOCI)}) & Analysis agents running in parallel...")
+    research_phases = [f"Research ({focus})" for focus in RESEARCH_FOCI]
+    outcomes = await asyncio.gather(
+        *(
+            run_streamed(
+                phase, run_research_phase, user_query, focus,
+                api_key_hash, PROMPT_VERSION, GROQ_MODEL, api_key
+            )
+            for phase, focus in zip(research_phases, RESEARCH_FOCI)
+        ),
+        run_streamed("Analysis", run_analysis_phase, user_query, api_key_hash, PROMPT_VERSION, GROQ_MODEL, api_key),
+        return_exceptions=True
+    )
+    for outcome in outcomes:
+        if isinstance(outcome, BaseException) and not isinstance(outcome, Exception):
+            raise outcome  # Streamlit's stop/rerun (or cancellation) ends the run, not just this phase
+    outputs, failures = {}, []
+    for phase, outcome in zip(research_phases + ["Analysis"], outcomes):
+        if isinstance(outcome, Exception):
+            failures.append(outcome)
+        else:
+            outputs[phase] = outcome
+    if not outputs:
+        raise failures[0]  # Nothing usable: report the first error as a failed run
+
+    # Sub-agent sections are already numbered, so joining in focus order rebuilds the full report
+    research_results = '\n\n'.join(outputs[phase] for phase in research_phases if phase in outputs)
+    analysis_results = outputs.get("Analysis", '')
+    status.write(
+        f"✅ Research & Analysis Phases Complete - {len(research_results)} + {len(analysis_results)} characters generated"
+    )
+
+    if failures:
+        notes = [str(e) for e in failures]
+        status.warning("⚠️ Skipping synthesis - " + "; ".join(notes))
+        final_results = "Executive synthesis skipped - not every phase completed:\n" + '\n'.join(f"- {note}" for note in notes)
+        return research_results, analysis_results, final_results, notes
+
+    # Phase 3: Orchestrator Agent
+    status.update(label="🎯 Phase 3: Assembling the report and writing its executive summary...")
+    final_results = await run_streamed(
+        "Orchestration", run_orchestration_phase, user_query, research_results, analysis_results,
+        api_key_hash, PROMPT_VERSION, GROQ_MODEL, api_key
+    )
+    status.write(f"✅ Orchestration Phase Complete - {len(final_results)} characters generated")
+
+    return research_results, analysis_results, final_results, []
+
+def run_hybrid_multi_agent_analysis_with_docx(user_query, api_key, export_to_docx=True, fast_mode=True):
+    """
+    Execute complete hybrid multi-agent workflow with professional DOCX export
+    Returns results dict and optional docx bytes
+    """
+    return asyncio.run(run_hybrid_multi_agent_analysis_async(user_query, api_key, export_to_docx, fast_mode))
+
+async def run_hybrid_multi_agent_analysis_async(user_query, api_key, export_to_docx=True, fast_mode=True):
+    """
+    Async workflow driver - crews run off the script thread so waits never block it
+    Progress goes to one st.status block: its label tracks the phase, completed steps are listed inside
+    """
+
+    status = st.status("🚀 Starting Enhanced Hybrid Multi-Agent Analysis...", expanded=True)
+    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    status.write('\n\n'.join([
+        f"📝 Query: {user_query}",
+        f"⏰ Started at: {timestamp}",
+        f"📄 DOCX Export: {'Enabled' if export_to_docx else 'Disabled'}",
+        f"⚠️ Rate Limiting: Shared {GROQ_RPM_LIMIT} RPM / {GROQ_TPM_LIMIT} TPM token bucket"
+    ]))
+
+    try:
+        api_key_hash = hash_api_key(api_key)
+
+        with status:
+            sections = None
+            partial = []
+            if fast_mode:
+                # Fast mode: one Groq call emitting all three tagged parts
+                status.update(label="⚡ Fast mode: single-call Research, Analysis & Synthesis...")
+                try:
+                    sections = await run_streamed(
+                        "Fused", run_fused_phase, user_query, api_key_hash, PROMPT_VERSION, GROQ_MODEL, api_key
+                    )
+                except PhaseError as e:
+                    if not isinstance(e.error, FusedOutputError):
+                        raise
+                    status.warning("⚠️ Fast mode response was missing sections - falling back to 3-phase analysis")
+                else:
+                    research_results = sections['research']
+                    analysis_results = sections['analysis']
+                    final_results = sections['final_report']
+                    status.write(f"✅ Fused Phase Complete - {sum(map(len, sections.values()))} characters generated")
+
+            if not sections:
+                research_results, analysis_results, final_results, partial = await run_three_phase_pipeline(
+                    user_query, api_key, api_key_hash, status
+                )
+
+            # Compile results
+            results = {
+                'query': user_query,
+                'timestamp': timestamp,
+                'research': research_results,
+                'analysis': analysis_results,
+                'final_report': final_results,
+                'mode': 'fused' if sections else 'pipeline',
+                'executive_summary': extract_executive_summary(final_results),
+                'partial': partial
+            }
+
+            # DOCX Export Phase
+            docx_bytes = None
+            if export_to_docx:
+                status.update(label="📄 Phase 4: Creating Word document with executive formatting...")
+                try:
+                    docx_bytes = create_docx_bytes(results)
+                    results['docx_bytes'] = docx_bytes
+                    status.write("✅ DOCX Export Complete")
+                except Exception as e:
+                    status.error(f"⚠️ DOCX Export Error: {e}")
+                    status.write("📋 Analysis results still available as text output")
+
+            finished = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            if partial:
+                status.update(label=f"⚠️ PARTIAL ANALYSIS - synthesis skipped - {finished}", state="complete")
+            else:
+                status.update(label=f"✅ HYBRID MULTI-AGENT ANALYSIS COMPLETE - {finished}", state="complete")
+
+        return results, docx_bytes
+
+    except Exception as e:
+        status.update(label=f"❌ {e}", state="error")
+        if is_rate_limit_error(e):
+            st.error(f"🚨 RATE LIMIT ERROR: {e}")
+            st.info("""
+            💡 SOLUTIONS:
+            1. Wait 60 seconds and try again
+            2. Use a shorter, simpler query
+            3. Consider upgrading your Groq plan for higher limits
+            """)
+            return {"error": "rate_limit", "phase": getattr(e, 'phase', None), "message": str(e)}, None
+        else:
+            st.error(f"🚨 SYSTEM ERROR: {e}")
+            st.info("""
+            💡 TROUBLESHOOTING:
+            1. Check your internet connection
+            2. Verify your Groq API key is valid
+            3. Try restarting the app if issues persist
+            """)
+            return {"error": "system", "phase": getattr(e, 'phase', None), "message": str(e)}, None
+
+# STEP 9: Professional DOCX Report Generator
+# Header method line per mode that ran: 'fused' (fast mode) or 'pipeline' (3-phase crews)
+_ANALYSIS_METHODS = {
+    'fused': "Fast Mode (one fused Research + Analysis + Synthesis agent in a single call)",
+    'pipeline': "Hybrid Multi-Agent System (Research + Analysis in parallel → Synthesis)",
+}
+# Constant lines of the SYSTEM METADATA section per mode, around the per-report timestamp
+_SYSTEM_METADATA_HEADERS = {
+    'fused': """Analysis Framework: Fast Mode Single-Agent Intelligence System
+Fused Agent: Chief Research, Analysis and Synthesis Expert
+LLM Technology: Groq Llama-3.1-8B-Instant
+Processing Method: One call covering research, analysis and synthesis, with rate limiting""",
+    'pipeline': """Analysis Framework: Hybrid Multi-Agent Intelligence System
+Research Agent: Senior Research Specialist with domain expertise
+Analysis Agent: Senior Data Analyst and Strategic Advisor
+Orchestrator Agent: Chief Synthesis Expert and Executive Advisor
+LLM Technology: Groq Llama-3.1-8B-Instant
+Processing Method: Parallel research and analysis, then synthesis, with rate limiting""",
+}
+_SYSTEM_METADATA_FOOTER = "Total Processing Time: ~2-3 minutes"
+
+def extract_executive_summary(final_report):
+    """First few lines of the report's EXECUTIVE SUMMARY section, joined; empty if absent"""
+    summary = split_sections(final_report).get('EXECUTIVE SUMMARY', '')
+    lines = summary[:500].split('\n')
+    return ' '.join(line.strip() for line in lines[:5] if line.strip())
+
+# Filename sanitizing: a deletion table for ASCII characters other than letters, digits, space, '-' and '_'
+_SAFE_CHARS = frozenset(string.ascii_letters + string.digits + ' -_')
+_TRANS = str.maketrans('', '', ''.join(chr(i) for i in range(128) if chr(i) not in _SAFE_CHARS))
+
+def safe_filename(text):
+    """Filename-safe text: only alphanumerics (any script), space, '-' and '_' are kept"""
+    text = text.translate(_TRANS)
+    if not text.isascii():
+        # Emoji, smart quotes, dashes etc. are outside the table; keep only non-ASCII letters/digits
+        text = ''.join(c for c in text if c.isascii() or c.isalnum())
+    return text
+
+def create_docx_bytes(results):
+    """
+    Generate a professional Word document from multi-agent analysis results
+    results['mode'] ('fused' or 'pipeline') picks how the analysis method is described
+    Returns a BytesIO buffer for download
+    """
+
+    try:
+        st.info("Creating document structure...")
+        formatter = MultiAgentDocumentFormatter()
+
+        # Document Header with Title and Metadata
+        formatter.add_header(
+            title="MULTI-AGENT INTELLIGENCE ANALYSIS REPORT",
+            query=results['query'],
+            timestamp=results['timestamp'],
+            method=_ANALYSIS_METHODS[results['mode']]
+        )
+
+        # Partial-completion notice when some phases failed
+        if results.get('partial'):
+            formatter.add_section(
+                "⚠️ PARTIAL REPORT",
+                "Not every phase completed, so the executive synthesis was skipped.\n" + '\n'.join(results['partial'])
+            )
+
+        # Executive Summary (extracted once when the analysis finished)
+        if results.get('executive_summary'):
+            formatter.add_executive_summary_box(results['executive_summary'])
+
+        # Research Findings Section
+        formatter.add_section("🔍 RESEARCH FINDINGS & INTELLIGENCE", results['research'])
+
+        # Analysis Section
+        formatter.add_section("📊 COMPREHENSIVE ANALYSIS & INSIGHTS", results['analysis'])
+
+        # Final Executive Report; a summary-only report (the 3-phase path) is already in the box above
+        summary_only = set(split_sections(results['final_report'])) == {'EXECUTIVE SUMMARY'}
+        if not (summary_only and results.get('executive_summary')):
+            formatter.add_section("🎯 EXECUTIVE SYNTHESIS & RECOMMENDATIONS", results['final_report'])
+
+        # System Information Footer
+        system_info = '\n'.join([
+            _SYSTEM_METADATA_HEADERS[results['mode']],
+            f"Document Generated: {results['timestamp']}",
+            _SYSTEM_METADATA_FOOTER
+        ])
+
+        formatter.add_section("ℹ️ SYSTEM METADATA", system_info, is_main_section=False)
+
+        # Generate timestamped filename
+        safe_query = safe_filename(results['query'][:30]).strip().replace(' ', '_')
+        timestamp_str = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename = f"Multi_Agent_Analysis_{safe_query}_{timestamp_str}.docx"
+
+        # Get document buffer (st.download_button reads it directly)
+        docx_buffer = formatter.get_document_buffer()
+        st.success("✅ Professional Word document created successfully")
+        return docx_buffer, filename
+
+    except Exception as e:
+        st.error(f"⚠️ DOCX Generation Error: {e}")
+        st.info("📋 Analysis results are still available as text output below")
+        st.info("💡 You can manually copy the text results if needed")
+        return None, None
+
+@st.fragment
+def display_results(results, docx_data, export_docx):
+    """Render the latest analysis results and DOCX download; widgets here rerun only this fragment"""
+    if 'error' not in results:
+        if results.get('partial'):
+            st.warning("⚠️ Partial results - synthesis skipped: " + "; ".join(results['partial']))
+        else:
+            st.success("✅ Analysis Complete! View results below.")
+
+        # Display Results
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.markdown('<h3 class="sub-header">🔍 Research Findings</h3>', unsafe_allow_html=True)
+            st.markdown(f'<div class="status-box">{results["research"]}</div>', unsafe_allow_html=True)
+
+            st.markdown('<h3 class="sub-header">📊 Analysis Insights</h3>', unsafe_allow_html=True)
+            st.markdown(f'<div class="status-box">{results["analysis"]}</div>', unsafe_allow_html=True)
+
+        with col2:
+            st.markdown('<h3 class="sub-header">🎯 Executive Report</h3>', unsafe_allow_html=True)
+            st.markdown(f'<div class="status-box">{results["final_report"]}</div>', unsafe_allow_html=True)
+
+        # Download DOCX - rendered directly; on_click="ignore" avoids a rerun on click
+        if docx_data and export_docx:
+            docx_buffer, filename = docx_data
+            if docx_buffer:
+                st.download_button(
+                    label="📥 Download Professional DOCX Report",
+                    data=docx_buffer,
+                    file_name=filename,
+                    mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+                    help="Download the executive-level Word document",
+                    on_click="ignore"
+                )
+
+        # Example Queries
+        st.markdown("---")
+        st.markdown('<h4 class="sub-header">💡 Example Queries to Try</h4>', unsafe_allow_html=True)
+        examples = [
+            "What are the key investment opportunities in renewable energy?",
+            "How will AI impact the Indian financial sector by 2025?",
+            "What are the risks and benefits of cryptocurrency adoption?",
+            "Analyze the future of remote work and its business implications"
+        ]
+        for example in examples:
+            if st.button(example, key=example):
+                st.rerun()
+
+    else:
+        st.error(f"❌ Error: {results.get('message', 'Unknown error')}")
+        if results.get('error') == 'rate_limit':
+            st.info("💡 This is normal with free Groq tier - wait 60 seconds and try again")
+
+# Main Streamlit App
+def main():
+    st.markdown('<h1 class="main-header">🤖 Multi-Agent AI Analysis System</h1>', unsafe_allow_html=True)
+    st.markdown('<p style="text-align: center; color: #666;">Professional Intelligence Analysis with Executive Reporting</p>', unsafe_allow_html=True)
+
+    # Sidebar for API Key
+    st.sidebar.header("🔑 Configuration")
+    api_key = st.sidebar.text_input("Groq API Key", type="password", help="Enter your Groq API key (starts with 'gsk_')")
+    # For production, uncomment the next line and use secrets
+    # api_key = st.secrets.get("GROQ_API_KEY", "")
+
+    export_docx = st.sidebar.checkbox("📄 Generate DOCX Report", value=True, help="Create professional Word document for download")
+    fast_mode = st.sidebar.checkbox("⚡ Fast mode (single-call synthesis)", value=True, help="Produce research, analysis and the executive report in one Groq call")
+
+    # Demo Query Option
+    use_demo = st.sidebar.checkbox("🎯 Use Demo Query", value=False)
+    if use_demo:
+        default_query = "What are the top 3 emerging AI trends for 2025 and their business impact?"
+    else:
+        default_query = ""
+
+    # Main Query Input
+    st.markdown('<h2 class="sub-header">📝 Enter Your Analysis Query</h2>', unsafe_allow_html=True)
+    user_query = st.text_area(
+        "What would you like to analyze?",
+        value=default_query,
+        height=100,
+        placeholder="e.g., What are the key investment opportunities in renewable energy?"
+    )
+
+    # Whitespace-normalized so trivially different inputs share cached phase results
+    query = ' '.join(user_query.split())
+
+    # Run Button
+    if st.button("🚀 Run Multi-Agent Analysis", type="primary", disabled=not api_key or not query):
+        if not api_key:
+            st.warning("⚠️ Please enter your Groq API key in the sidebar.")
+            return
+        if not query:
+            st.warning("⚠️ Please enter a query.")
+            return
+
+        # Progress Bar
+        progress_bar = st.progress(0)
+        status_text = st.empty()
+
+        # Run Analysis
+        with st.spinner("Initiating multi-agent workflow..."):
+            results, docx_data = run_hybrid_multi_agent_analysis_with_docx(query, api_key, export_docx, fast_mode)
+
+        # Keep results across reruns so widget interactions don't discard them
+        st.session_state.results = results
+        st.session_state.docx_data = docx_data
+
+    if st.session_state.get('results'):
+        display_results(st.session_state.results, st.session_state.get('docx_data'), export_docx)
+
+    # Instructions
+    with st.expander("ℹ️ How to Use & Deploy", expanded=False):
+        st.markdown("""
+        ### Usage Instructions
+        1. **Enter Groq API Key**: In the sidebar (get one from [Groq Console](https://console.groq.com)).
+        2. **Input Query**: Describe what you want to analyze.
+        3. **Run Analysis**: Click the button to start the 3-phase multi-agent process.
+        4. **View Results**: See structured outputs in columns.
+        5. **Download DOCX**: Get a professional Word report if enabled.
+
+        ### Notes
+        - Analysis takes ~2-3 minutes; throttled calls are retried automatically.
+        - Fast mode (sidebar) produces all three outputs in one Groq call; turn it off for the full 3-phase process.
+        - Verbose output is disabled to keep the UI clean.
+        - Handles errors gracefully with troubleshooting tips.
+        - SQLite patched with pysqlite3-binary to meet ChromaDB requirements.
+        """)
+
+if __name__ == "__main__":
+    main()
+
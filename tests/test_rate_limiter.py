@@ -0,0 +1,75 @@
+import unittest
+from unittest import mock
+
+from streamlit_app import GroqRateLimiter
+
+
+class FakeClock:
+    """Stands in for the time module; sleep advances monotonic() instead of blocking"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class GroqRateLimiterTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch('streamlit_app.time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_admits_within_quota_without_waiting(self):
+        limiter = GroqRateLimiter(rpm=3, tpm=1000)
+        for _ in range(3):
+            limiter.acquire(300)
+        self.assertEqual(self.clock.sleeps, [])
+        self.assertEqual(len(limiter.calls), 3)
+
+    def test_rpm_cap_waits_for_the_oldest_call_to_leave_the_window(self):
+        limiter = GroqRateLimiter(rpm=2, tpm=10000)
+        limiter.acquire(10)
+        self.clock.now += 15
+        limiter.acquire(10)
+        limiter.acquire(10)
+        self.assertEqual(self.clock.sleeps, [45.0])
+        self.assertEqual(len(limiter.calls), 2)
+
+    def test_tpm_cap_waits_for_tokens_to_free_up(self):
+        limiter = GroqRateLimiter(rpm=30, tpm=1000)
+        limiter.acquire(800)
+        limiter.acquire(300)
+        self.assertEqual(self.clock.sleeps, [60.0])
+
+    def test_empty_window_admits_an_oversize_estimate(self):
+        limiter = GroqRateLimiter(rpm=30, tpm=1000)
+        ticket = limiter.acquire(5000)
+        self.assertEqual(ticket[1], 5000)
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_expired_calls_are_evicted(self):
+        limiter = GroqRateLimiter(rpm=30, tpm=1000)
+        limiter.acquire(900)
+        self.clock.now += 60
+        limiter.acquire(900)
+        self.assertEqual(self.clock.sleeps, [])
+        self.assertEqual(len(limiter.calls), 1)
+
+    def test_settle_refunds_an_overestimate(self):
+        limiter = GroqRateLimiter(rpm=30, tpm=1000)
+        ticket = limiter.acquire(900)
+        limiter.settle(ticket, 100)
+        limiter.acquire(800)
+        self.assertEqual(self.clock.sleeps, [])
+        self.assertEqual(sum(cost for _, cost in limiter.calls), 900)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+
+from streamlit_app import extract_executive_summary, map_report_sections, split_sections, synthesize_report
+
+
+class SplitSectionsTest(unittest.TestCase):
+    def test_numbered_and_markdown_headings(self):
+        text = "1. KEY FINDINGS:\nfacts\n\n## 2. Current Trends\ntrends\n\n**RISK ASSESSMENT**:\nrisks"
+        self.assertEqual(
+            split_sections(text),
+            {'KEY FINDINGS': 'facts', 'CURRENT TRENDS': 'trends', 'RISK ASSESSMENT': 'risks'}
+        )
+
+    def test_heading_word_inside_body_line_is_not_a_heading(self):
+        text = "1. KEY FINDINGS:\nConclusion: adoption is rising"
+        self.assertEqual(split_sections(text), {'KEY FINDINGS': 'Conclusion: adoption is rising'})
+
+    def test_bare_leading_digits_are_not_a_number_prefix(self):
+        text = "1. KEY FINDINGS:\n2025 Conclusion"
+        self.assertEqual(split_sections(text), {'KEY FINDINGS': '2025 Conclusion'})
+
+    def test_plain_case_heading_followed_by_prose_is_not_a_heading(self):
+        self.assertEqual(split_sections("Key findings: adoption is rising"), {})
+
+    def test_uppercase_or_bold_heading_can_start_the_body(self):
+        self.assertEqual(
+            split_sections("EXECUTIVE SUMMARY: AI adoption is accelerating.\nMore.\n\nKEY FINDINGS: facts"),
+            {'EXECUTIVE SUMMARY': 'AI adoption is accelerating.\nMore.', 'KEY FINDINGS': 'facts'}
+        )
+        self.assertEqual(
+            split_sections("1. **Executive Summary:** AI is big.\n2. **Key Findings**: facts"),
+            {'EXECUTIVE SUMMARY': 'AI is big.', 'KEY FINDINGS': 'facts'}
+        )
+
+    def test_parenthesized_and_roman_number_prefixes(self):
+        self.assertEqual(split_sections("1) EXECUTIVE SUMMARY\nsummary"), {'EXECUTIVE SUMMARY': 'summary'})
+        self.assertEqual(
+            split_sections("I. EXECUTIVE SUMMARY\nsummary\nII. KEY FINDINGS\nfacts"),
+            {'EXECUTIVE SUMMARY': 'summary', 'KEY FINDINGS': 'facts'}
+        )
+
+
+class ExtractExecutiveSummaryTest(unittest.TestCase):
+    def test_summary_on_the_heading_line(self):
+        for report in (
+            "EXECUTIVE SUMMARY: AI adoption is accelerating.\n\nKEY FINDINGS:\nfacts",
+            "1. **Executive Summary:** AI adoption is accelerating.\n2. **Key Findings:** facts",
+            "1) EXECUTIVE SUMMARY\nAI adoption is accelerating.\n2) KEY FINDINGS\nfacts",
+            "I. EXECUTIVE SUMMARY\nAI adoption is accelerating.\nII. KEY FINDINGS\nfacts",
+        ):
+            self.assertEqual(extract_executive_summary(report), 'AI adoption is accelerating.')
+
+
+class MapReportSectionsTest(unittest.TestCase):
+    def test_sections_keep_their_source_headings(self):
+        research = "1. KEY FINDINGS:\nfacts\n\n2. CONTEXTUAL BACKGROUND:\nhistory\n\n4. CURRENT TRENDS:\ntrends"
+        analysis = "2. QUALITATIVE ANALYSIS:\nquality\n\n4. PREDICTIVE ANALYSIS:\nforecast"
+        self.assertEqual(
+            list(map_report_sections(research, analysis).items()),
+            [
+                ('KEY FINDINGS', 'facts'),
+                ('CONTEXTUAL BACKGROUND', 'history'),
+                ('CURRENT TRENDS', 'trends'),
+                ('QUALITATIVE ANALYSIS', 'quality'),
+                ('PREDICTIVE ANALYSIS', 'forecast'),
+            ]
+        )
+
+    def test_output_without_headings_is_kept_whole(self):
+        self.assertEqual(
+            map_report_sections("plain research", "plain analysis"),
+            {'KEY FINDINGS': 'plain research', 'STRATEGIC RECOMMENDATIONS': 'plain analysis'}
+        )
+
+
+
+class SynthesizeReportTest(unittest.TestCase):
+    def test_report_holds_only_the_summary(self):
+        report = synthesize_report(" Adoption is accelerating. ")
+        self.assertEqual(report, "EXECUTIVE SUMMARY:\nAdoption is accelerating.")
+        self.assertEqual(extract_executive_summary(report), "Adoption is accelerating.")
+
+    def test_echoed_heading_is_not_repeated(self):
+        self.assertEqual(
+            synthesize_report("EXECUTIVE SUMMARY\nAdoption is accelerating."),
+            "EXECUTIVE SUMMARY:\nAdoption is accelerating."
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()